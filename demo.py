@@ -11,7 +11,6 @@ patterns of bad-actor tradecraft.
 import pathlib
 
 from dotenv import dotenv_values
-from icecream import ic
 from kleptosyn import Network, Simulation, SynData, get_repo_version
 
 N_CRIMES: int = 3
@@ -21,7 +20,7 @@ N_CRIMES: int = 3
 ## main entry point
 
 if __name__ == "__main__":
-    ic(get_repo_version())
+    print("kleptosyn", get_repo_version())
     config: dict = dotenv_values(".env")
 
     sim: Simulation = Simulation(config)
@@ -37,6 +36,10 @@ if __name__ == "__main__":
     #net.report()
     #sys.exit(0)
 
+    syn.open_streams(
+        pathlib.Path(config["data_path"]) / "transact.csv",
+    )
+
     for _ in range(N_CRIMES):
         sim.simulate_fraud(net, syn)
 
@@ -47,7 +50,7 @@ if __name__ == "__main__":
         pathlib.Path(config["data_path"]) / "entities.csv",
     )
 
-    ic(sim.finish, sim.total_fraud)
+    print("finish:", sim.finish, "total fraud:", sim.total_fraud)
 
 
 """  # pylint: disable=W0105
@@ -8,20 +8,65 @@ Represent a graph of potential bad-actor networks.
 """
 
 from collections import Counter
-import json
+import functools
+import itertools
+import logging
+import os
 import pathlib
 import random
 import sys
-import traceback
 import typing
 import unicodedata
 
 #from charset_normalizer import from_bytes
-from icecream import ic  # type: ignore  # pylint: disable=E0401
+import msgspec
 import networkx as nx
+import numpy as np
 import pycountry
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+######################################################################
+## schema for the entity resolution results exported from Senzing,
+## which only declares the fields used to construct the graph
+
+class ErRecord (msgspec.Struct):  # pylint: disable=R0903
+    """
+A data record resolved into an entity.
+    """
+    RECORD_ID: str
+    MATCH_KEY: str = ""
+    MATCH_LEVEL: int = 0
+    ENTITY_DESC: str = ""
+
+
+class ErResolved (msgspec.Struct):  # pylint: disable=R0903
+    """
+A resolved entity.
+    """
+    ENTITY_ID: int
+    RECORDS: typing.List[ ErRecord ] = []
+
+
+class ErRelated (msgspec.Struct):  # pylint: disable=R0903
+    """
+An entity related to a resolved entity.
+    """
+    ENTITY_ID: int
+    MATCH_KEY: str = ""
+    MATCH_LEVEL: int = 0
+
+
+class ErExport (msgspec.Struct):  # pylint: disable=R0903
+    """
+One line of the Senzing JSON export.
+    """
+    RESOLVED_ENTITY: ErResolved
+    RELATED_ENTITIES: typing.List[ ErRelated ] = []
+
+
 ######################################################################
 ## class definitions: network of bad actors
 
@@ -30,6 +75,10 @@ class Network:
 Network to sample for simulated bad actors.
     """
     ER_ENTITY_PREFIX: str = "sz_"
+    ER_DECODER: msgspec.json.Decoder = msgspec.json.Decoder(ErExport, strict = False)
+    JSON_DECODER: msgspec.json.Decoder = msgspec.json.Decoder()
+    READ_CHUNK_SIZE: int = 8 << 20  # 8 MiB
+    WRITE_BUFFER_SIZE: int = 1 << 20  # 1 MiB
 
     # graph semantics: <https://followthemoney.tech/explorer/>
     # ftm:Person, ftm:Company, ftm:Payment
@@ -39,6 +88,20 @@ Network to sample for simulated bad actors.
         "transaction": "ftm:Payment",
     }
 
+    # record sections to search for a country code, in priority order,
+    # each with the set of keys which hold the code
+    COUNTRY_FIELDS: typing.Tuple[ typing.Tuple[ str, typing.FrozenSet[ str ]], ... ] = (
+        ( "COUNTRIES", frozenset([ "CITIZENSHIP", "NATIONALITY", "REGISTRATION_COUNTRY" ]), ),
+        ( "ADDRESSES", frozenset([ "ADDR_COUNTRY" ]), ),
+        ( "ATTRIBUTES", frozenset([ "NATIONALITY" ]), ),
+    )
+
+    # ISO 3166 alpha-2 codes, to validate country codes in O(1)
+    COUNTRY_CODES: typing.FrozenSet[ str ] = frozenset(
+        country.alpha_2
+        for country in pycountry.countries
+    )
+
 
     def __init__ (
         self,
@@ -50,17 +113,70 @@ Constructor.
         self.config: dict = config
         self.graph: nx.DiGraph = nx.DiGraph()
 
+        # resolved data records per entity, memoized by `get_pii_features()`
+        self.rec_lists: typing.Dict[ str, typing.List[ str ]] = {}
+
+
+    @classmethod
+    def read_jsonl (
+        cls,
+        jsonl_file: pathlib.Path,
+        *,
+        decoder: typing.Optional[ msgspec.json.Decoder ] = None,
+        ) -> typing.Iterator[ typing.Any ]:
+        """
+Iterate through the records of a JSONL file, reading in large chunks
+then splitting lines, rather than iterating one line at a time.
+
+Records get parsed into dictionaries, unless a typed `msgspec`
+decoder is provided.
+
+yields:
+    parsed JSON records
+        """
+        decode: typing.Callable = (cls.JSON_DECODER if decoder is None else decoder).decode
+        tail: bytes = b""
+
+        with open(jsonl_file, "rb") as fp:
+            # hint the kernel to read ahead, on platforms which support it
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            while chunk := fp.read(cls.READ_CHUNK_SIZE):
+                chunk = tail + chunk
+                last_nl: int = chunk.rfind(b"\n")
+
+                if last_nl < 0:
+                    tail = chunk
+                    continue
 
+                tail = chunk[last_nl + 1:]
+
+                for line in chunk[:last_nl].split(b"\n"):
+                    if line.strip():
+                        yield decode(line)
+
+        if tail.strip():
+            yield decode(tail)
+
+
+    @staticmethod
+    @functools.lru_cache(maxsize = 500_000)
     def scrub_text (
-        self,
         text: str,
-        ) -> typing.Optional[ str ]:
+        ) -> str:
         """
 Scrub text of non-printable characters, typesetting artifacts, UTF-8 errors, etc.
 Courtesy of <https://github.com/DerwenAI/pytextrank>
+
+The results get memoized, since names, addresses, and match keys
+repeat heavily across these datasets; see `scrub_text.cache_info()`
+
+Always returns a `str`, possibly empty, so callers test with `not`.
         """
-        if text is None:
-            return None
+        # fast path: NFKD and the zero-width space cannot change pure ASCII
+        if text.isascii():
+            return text.strip()
 
         #return str(unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("utf-8").replace("\u200b", ""))
 
@@ -81,46 +197,38 @@ Courtesy of <https://github.com/DerwenAI/pytextrank>
         dat: dict,
         *,
         debug: bool = False,  # pylint: disable=W0613
-        ) -> str:
+        ) -> typing.Optional[ str ]:
         """
 Extract names from the input data records.
+
+returns:
+    the scrubbed name, or `None` when the record fails the data quality check
         """
-        try:
-            name: typing.Optional[ str ] = None
+        name: typing.Optional[ str ] = dat.get("PRIMARY_NAME_FULL")
 
-            if "PRIMARY_NAME_FULL" in dat:
-                name = dat["PRIMARY_NAME_FULL"]
-            else:
-                for rec in dat["NAMES"]:
-                    if "NAME_TYPE" in rec and rec["NAME_TYPE"] == "PRIMARY":
-                        if "NAME_FULL" in rec:
-                            name = rec["NAME_FULL"]
-                            break
-                        if "NAME_ORG" in rec:
-                            name = rec["NAME_ORG"]
-                            break
-                    elif "PRIMARY_NAME_ORG" in rec:
-                        name = rec["PRIMARY_NAME_ORG"]
-                        break
+        if name is None:
+            for rec in dat.get("NAMES", ()):
+                if rec.get("NAME_TYPE") == "PRIMARY":
+                    name = rec.get("NAME_FULL")
 
-            if name is not None:
-                name = self.scrub_text(name)
+                    if name is None:
+                        name = rec.get("NAME_ORG")
 
-                if name == "-" or len(name) < 1:  # type: ignore
-                    name = None
+                    if name is not None:
+                        break
+                else:
+                    name = rec.get("PRIMARY_NAME_ORG")
 
-            if name is None:
-                print("extract_name DQ:", dat)
-                sys.exit(0)
+                    if name is not None:
+                        break
 
-            return name
+        if name is not None:
+            name = self.scrub_text(name)
 
-        except Exception as ex:  # pylint: disable=W0718
-            ic(ex)
-            traceback.print_exc()
+            if not name or name == "-":
+                name = None
 
-            ic(dat)
-            sys.exit(0)
+        return name
 
 
     def extract_addr (
@@ -132,83 +240,80 @@ Extract names from the input data records.
         """
 Extract addresses from the input data records.
         """
-        try:
-            addr: typing.Optional[ str ] = None
+        addr: typing.Optional[ str ] = None
 
-            if "ADDRESSES" in dat:
-                for rec in dat["ADDRESSES"]:
-                    if "ADDR_FULL" in rec:
-                        addr = rec["ADDR_FULL"]
-                        break
+        for rec in dat.get("ADDRESSES", ()):
+            addr = rec.get("ADDR_FULL")
 
             if addr is not None:
-                addr = self.scrub_text(addr)
-
-                if addr == "-" or len(addr) < 1:  # type: ignore
-                    addr = None
+                break
 
-            return addr
+        if addr is not None:
+            addr = self.scrub_text(addr)
 
-        except Exception as ex:  # pylint: disable=W0718
-            ic(ex)
-            traceback.print_exc()
+            if not addr or addr == "-":
+                addr = None
 
-            ic(dat)
-            sys.exit(0)
+        return addr
 
 
-    def extract_country (  # pylint: disable=R0912
-        self,
+    @classmethod
+    def search_country_fields (
+        cls,
         dat: dict,
-        *,
-        debug: bool = False,  # pylint: disable=W0613
         ) -> typing.Optional[ str ]:
         """
-Extract country codes from the input data records.
+Search the record sections listed in `COUNTRY_FIELDS` for a country code.
+Only the first section present gets searched, and within it the last
+record which has one of the keys wins.
+
+returns:
+    the country code as found, or `None`
         """
-        try:
-            country: typing.Optional[ str ] = None
+        country: typing.Optional[ str ] = None
 
-            if "REGISTRATION_COUNTRY" in dat:
-                country = dat["REGISTRATION_COUNTRY"].strip().upper()
-            elif "COUNTRIES" in dat:
-                for rec in dat["COUNTRIES"]:
+        for section, keys in cls.COUNTRY_FIELDS:
+            if section in dat:
+                for rec in dat[section]:
                     for key, val in rec.items():
-                        if key in ["CITIZENSHIP", "NATIONALITY", "REGISTRATION_COUNTRY"]:
-                            country = val.strip().upper()
-                            break
-            elif "ADDRESSES" in dat:
-                for rec in dat["ADDRESSES"]:
-                    for key, val in rec.items():
-                        if key in ["ADDR_COUNTRY"]:
-                            country = val.strip().upper()
-                            break
-            elif "ATTRIBUTES" in dat:
-                for rec in dat["ATTRIBUTES"]:
-                    for key, val in rec.items():
-                        if key in ["NATIONALITY"]:
+                        if key in keys:
                             country = val.strip().upper()
                             break
 
-            # data quality check
-            if country is not None:
-                if len(country) < 1:
-                    country = None
+                return country
 
-                else:
-                    country_info = pycountry.countries.get(alpha_2 = country)
+        return None
 
-                    if country_info is None:
-                        print("UNKONWN:", country)
 
-            return country
+    def extract_country (
+        self,
+        dat: dict,
+        *,
+        debug: bool = False,  # pylint: disable=W0613
+        ) -> typing.Optional[ str ]:
+        """
+Extract country codes from the input data records.
+        """
+        country: typing.Optional[ str ] = None
+
+        if "REGISTRATION_COUNTRY" in dat:
+            country = dat["REGISTRATION_COUNTRY"].strip().upper()
+        else:
+            country = self.search_country_fields(dat)
 
-        except Exception as ex:  # pylint: disable=W0718
-            ic(ex)
-            traceback.print_exc()
+        # data quality check
+        if country is not None:
+            if len(country) < 1:
+                country = None
 
-            ic(dat)
-            sys.exit(0)
+            elif country not in self.COUNTRY_CODES:
+                print("UNKONWN:", country)
+
+            # a small vocabulary repeated across every node, so share one copy
+            if country is not None:
+                country = sys.intern(country)
+
+        return country
 
 
     def load_dataset (
@@ -218,22 +323,45 @@ Extract country codes from the input data records.
         """
 Load a Senzing formatted JSON dataset.
         """
-        with open(dat_file, "rb") as fp:
-            for line in fp:
-                dat: dict = json.loads(line)
-                rec_id: str = dat["RECORD_ID"]
+        nodes: typing.List[ tuple ] = []
+        dq_fail: typing.List[ dict ] = []
 
-                self.graph.add_node(
-                    rec_id,
-                    kind = "data",
-                    type = self.FTM_CLASSES[dat["RECORD_TYPE"].lower()],
-                    name = self.extract_name(dat),
-                    addr = self.extract_addr(dat),
-                    country = self.extract_country(dat),
-                )
+        # bind the per-record helpers once, outside the loop
+        extract_name: typing.Callable = self.extract_name
+        extract_addr: typing.Callable = self.extract_addr
+        extract_country: typing.Callable = self.extract_country
+        ftm_classes: typing.Dict[ str, str ] = self.FTM_CLASSES
+
+        for dat in self.read_jsonl(dat_file):
+            rec_id: str = sys.intern(dat["RECORD_ID"])
+            name: typing.Optional[ str ] = extract_name(dat)
+
+            if name is None:
+                dq_fail.append(dat)
+
+            nodes.append((
+                rec_id,
+                {
+                    "kind": "data",
+                    "type": ftm_classes[dat["RECORD_TYPE"].lower()],
+                    "name": name,
+                    "addr": extract_addr(dat),
+                    "country": extract_country(dat),
+                },
+            ))
+
+            # FOO
+            # "RELATIONSHIPS": [{"REL_POINTER_DOMAIN": "OOR", "REL_POINTER_KEY": "12052062250481936308"
+
+        # report every record which failed the data quality checks at once,
+        # rather than halting on the first one
+        if len(dq_fail) > 0:
+            for dat in dq_fail:
+                print("extract_name DQ:", dat)
 
-                # FOO
-                # "RELATIONSHIPS": [{"REL_POINTER_DOMAIN": "OOR", "REL_POINTER_KEY": "12052062250481936308"
+            raise ValueError(f"{len(dq_fail)} records without a name in {dat_file}")
+
+        self.graph.add_nodes_from(nodes)
 
 
     def load_er_export (  # pylint: disable=R0914
@@ -243,85 +371,115 @@ Load a Senzing formatted JSON dataset.
         """
 Load the entity resolution results exported from Senzing.
         """
-        with open(er_export_file, "rb") as fp:
-            for line in fp:
-                dat: dict = json.loads(line)
-                ent_id: str = self.ER_ENTITY_PREFIX + str(dat["RESOLVED_ENTITY"]["ENTITY_ID"]).strip()
+        assert isinstance(self.graph, nx.DiGraph)
+
+        node_attr: dict = self.graph._node  # pylint: disable=W0212
+
+        ent_nodes: typing.Dict[ str, dict ] = {}
+        resolved_edges: typing.List[ tuple ] = []
+        related_edges: typing.List[ tuple ] = []
+
+        scrub_text: typing.Callable = self.scrub_text
+        ent_prefix: str = self.ER_ENTITY_PREFIX
 
-                if ent_id not in self.graph.nodes:
-                    self.graph.add_node(
-                        ent_id,
-                        kind = "entity",
-                    )
+        for dat in self.read_jsonl(er_export_file, decoder = self.ER_DECODER):
+            ent_id: str = sys.intern(ent_prefix + str(dat.RESOLVED_ENTITY.ENTITY_ID))
 
-                ent_desc: typing.Optional[ str ] = None
-                ent_type: typing.Optional[ str ] = None
+            if ent_id not in ent_nodes:
+                ent_nodes[ent_id] = { "kind": "entity" }
 
-                ent_countries: typing.List[ typing.Optional[ str ]] = []
+            ent_attr: dict = ent_nodes[ent_id]
+
+            ent_desc: typing.Optional[ str ] = None
+            ent_type: typing.Optional[ str ] = None
+
+            rec_name: typing.Optional[ str ] = None
+            country_counts: Counter = Counter()
+
+            # link to resolved data records
+            for dat_rec in dat.RESOLVED_ENTITY.RECORDS:
+                rec_id = sys.intern(dat_rec.RECORD_ID)
+                resolved_edges.append((
+                    ent_id,
+                    rec_id,
+                    {
+                        "kind": "resolved",
+                        "why": scrub_text(dat_rec.MATCH_KEY),
+                        "prob": dat_rec.MATCH_LEVEL,
+                    },
+                ))
 
-                # link to resolved data records
-                for dat_rec in dat["RESOLVED_ENTITY"]["RECORDS"]:
-                    rec_id = dat_rec["RECORD_ID"]
+                rec_attr: dict = node_attr[rec_id]
+                ent_type = rec_attr["type"]
+                rec_name = rec_attr["name"]
 
-                    self.graph.add_edge(
-                        ent_id,
-                        rec_id,
-                        kind = "resolved",
-                        why = self.scrub_text(dat_rec["MATCH_KEY"]),
-                        prob = int(dat_rec["MATCH_LEVEL"]),
-                    )
+                desc: str = dat_rec.ENTITY_DESC.strip()
+                country: typing.Optional[ str ] = rec_attr["country"]
 
-                    ent_type = self.graph.nodes[rec_id]["type"]
+                if len(desc) > 0:
+                    ent_desc = desc
 
-                    desc: str = dat_rec["ENTITY_DESC"].strip()
-                    country: typing.Optional[ str ] = self.graph.nodes[rec_id]["country"]
+                if country is not None and len(country) > 0:
+                    country_counts[country] += 1
 
-                    if len(desc) > 0:
-                        ent_desc = desc
+            ent_attr["type"] = ent_type
+            ent_attr["name"] = None if ent_desc is None else scrub_text(ent_desc)
 
-                    if country is not None and len(country) > 0:
-                        ent_countries.append(self.graph.nodes[rec_id]["country"])
+            # repair a missing person name by inheriting from the data records
+            if ent_attr["name"] is None and ent_type == "ftm:Person":
+                ent_attr["name"] = rec_name
 
-                self.graph.nodes[ent_id]["type"] = ent_type
-                self.graph.nodes[ent_id]["name"] = self.scrub_text(ent_desc)  # type: ignore
+            # the first country seen breaks any ties, as `most_common()` did
+            if len(country_counts) > 0:
+                ent_attr["country"] = max(country_counts, key = country_counts.get)  # type: ignore
 
-                country_counts: Counter = Counter(ent_countries)
+            # link to related entities
+            for rel_rec in dat.RELATED_ENTITIES:
+                rel_id: str = sys.intern(ent_prefix + str(rel_rec.ENTITY_ID))
 
-                if len(country_counts) > 0:
-                    self.graph.nodes[ent_id]["country"] = country_counts.most_common()[0][0]
+                if rel_id not in ent_nodes:
+                    ent_nodes[rel_id] = { "kind": "entity" }
 
-                # link to related entities
-                for rel_rec in dat["RELATED_ENTITIES"]:
-                    rel_id: str = self.ER_ENTITY_PREFIX + str(rel_rec["ENTITY_ID"]).strip()
+                related_edges.append((
+                    ent_id,
+                    rel_id,
+                    {
+                        "kind": "related",
+                        "why": scrub_text(rel_rec.MATCH_KEY),
+                        "prob": rel_rec.MATCH_LEVEL,
+                    },
+                ))
 
-                    if rel_id not in self.graph.nodes:
-                        self.graph.add_node(
-                            rel_id,
-                            kind = "entity",
-                        )
+        self.add_er_results(ent_nodes, itertools.chain(resolved_edges, related_edges))
 
-                    self.graph.add_edge(
-                        ent_id,
-                        rel_id,
-                        kind = "related",
-                        why = self.scrub_text(rel_rec["MATCH_KEY"]),
-                        prob = int(rel_rec["MATCH_LEVEL"]),
-                    )
 
-    def repair (
+    def add_er_results (
         self,
+        ent_nodes: typing.Dict[ str, dict ],
+        edges: typing.Iterable[ tuple ],
         ) -> None:
         """
-        Repair the names for each resolved entity by inheriting up
-        from the resolved data records
+Add the entity nodes and their edges from the entity resolution results
+to the graph, in one batch per file, as trusted writes into the `DiGraph`
+internals which bypass the per-edge validation in `add_edges_from()`
+-- all of these edges are new.
         """
-        for node_id, dat in self.graph.nodes(data = True):
-            if dat["kind"] == "entity" and dat["type"] == "ftm:Person" and dat["name"] is None:
-                for neigh_id in self.graph.neighbors(node_id):
-                    rec_dat: dict = self.graph.nodes[neigh_id]
+        node_attr: dict = self.graph._node  # pylint: disable=W0212
+        succ: dict = self.graph._succ  # pylint: disable=W0212
+        pred: dict = self.graph._pred  # pylint: disable=W0212
 
-                    if rec_dat["kind"] == "data":
-                        self.graph.nodes[node_id]["name"] = rec_dat["name"]
+        for ent_id, attr in ent_nodes.items():
+            if ent_id in node_attr:
+                node_attr[ent_id].update(attr)
+            else:
+                node_attr[ent_id] = attr
+                succ[ent_id] = {}
+                pred[ent_id] = {}
+
+        for src_id, dst_id, attr in edges:
+            succ[src_id][dst_id] = pred[dst_id][src_id] = attr
+
+        nx._clear_cache(self.graph)  # pylint: disable=W0212
 
 
     def load (
@@ -334,17 +492,71 @@ to construct a graph to sample as simulated bad actors.
   - OpenSanctions (risk data)
   - Open Ownership (link data)
         """
+        self.rec_lists.clear()
         data_path: pathlib.Path = pathlib.Path(self.config["data_path"])
 
-        self.load_dataset(data_path / "open-sanctions.json")
-        self.load_dataset(data_path / "open-ownership.json")
+        dat_files: typing.List[ pathlib.Path ] = [
+            data_path / "open-sanctions.json",
+            data_path / "open-ownership.json",
+        ]
+
+        for dat_file in dat_files:
+            self.load_dataset(dat_file)
 
         self.load_er_export(data_path / "export.json")
-        self.repair()
 
         # use centrality to rank entities (e.g., as influentual UBOs)
-        for node_id, rank in nx.eigenvector_centrality(self.graph).items():
-            self.graph.nodes[node_id]["rank"] = rank
+        node_attr: dict = self.graph._node  # pylint: disable=W0212
+
+        for node_id, rank in self.eigenvector_centrality().items():
+            node_attr[node_id]["rank"] = rank
+
+
+    def eigenvector_centrality (
+        self,
+        *,
+        max_iter: int = 100,
+        tol: float = 1.0e-06,
+        ) -> typing.Dict[ str, float ]:
+        """
+Compute eigenvector centrality for the nodes in the graph, with the
+same power iteration as `nx.eigenvector_centrality()` -- iterating on
+`(A + I)^T` from a uniform start, normalized by the Euclidean norm --
+although vectorized as sparse matrix products on a CSR adjacency
+matrix rather than looping through adjacency dictionaries.
+
+returns:
+    map of node IDs to their centrality
+        """
+        nodes: list = list(self.graph)
+        n_nodes: int = len(nodes)
+
+        if n_nodes == 0:
+            raise nx.NetworkXPointlessConcept("cannot compute centrality for the null graph")
+
+        adj_t = nx.to_scipy_sparse_array(
+            self.graph,
+            nodelist = nodes,
+            weight = None,
+            dtype = np.float64,
+            format = "csr",
+        ).T.tocsr()
+
+        x: np.ndarray = np.full(n_nodes, 1.0 / n_nodes)
+
+        for _ in range(max_iter):
+            x_last: np.ndarray = x
+            x = x_last + adj_t @ x_last
+
+            norm: float = float(np.linalg.norm(x))
+
+            if norm > 0.0:
+                x = x / norm
+
+            if float(np.abs(x - x_last).sum()) < n_nodes * tol:
+                return dict(zip(nodes, x.tolist()))
+
+        raise nx.PowerIterationFailedConvergence(max_iter)
 
 
     def get_pii_features (
@@ -355,27 +567,35 @@ to construct a graph to sample as simulated bad actors.
 Accessor builds and returns a dictionary of the PII features for the
 specified entity.
         """
+        node_attr: dict = self.graph._node  # pylint: disable=W0212
         rec_id: str = node_id
 
-        if self.graph.nodes[node_id]["kind"] == "entity":
-            rec_list: typing.List[ str ] = [
-                neigh_id
-                for neigh_id in self.graph.neighbors(node_id)
-                if self.graph.nodes[neigh_id]["kind"] == "data"
-                #if self.graph.nodes[neigh_id]["addr"] is not None
-            ]
+        if node_attr[node_id]["kind"] == "entity":
+            # the graph is fixed once loaded, so scan each entity's
+            # neighbors only once, while still sampling a record per call
+            rec_list: typing.Optional[ typing.List[ str ]] = self.rec_lists.get(node_id)
+
+            if rec_list is None:
+                rec_list = self.rec_lists[node_id] = [
+                    neigh_id
+                    for neigh_id in self.graph._succ[node_id]  # pylint: disable=W0212
+                    if node_attr[neigh_id]["kind"] == "data"
+                    #if node_attr[neigh_id]["addr"] is not None
+                ]
 
             if len(rec_list) > 0:
                 rec_id = random.choice(rec_list)
 
         if rec_id is None:
-            ic(node_id)
+            logger.error("no data record for node: %s", node_id)
             sys.exit(0)
 
+        rec_attr: dict = node_attr[rec_id]
+
         return {
-            "name": self.graph.nodes[rec_id]["name"],
-            "addr": self.graph.nodes[rec_id]["addr"],
-            "type": "person" if (self.graph.nodes[rec_id]["type"] == "ftm:Person") else "organization",
+            "name": rec_attr["name"],
+            "addr": rec_attr["addr"],
+            "type": "person" if (rec_attr["type"] == "ftm:Person") else "organization",
         }
 
 
@@ -384,34 +604,76 @@ specified entity.
         graph_file: pathlib.Path,
         ) -> None:
         """
-Serialize the bad-actor network.
-NB: this is considered the best way to handle JSON file writes with mixed charsets.
+Serialize the bad-actor network, in the node-link format used by
+`nx.node_link_data(graph, edges = "edges")`
+
+This streams one node or edge at a time, instead of materializing the
+intermediate node-link dictionary for the whole graph. A single
+`msgspec` encoder appends into one reused buffer, which gets flushed
+to the file whenever it exceeds `WRITE_BUFFER_SIZE`.
+NB: JSON gets written as UTF-8, which handles the mixed charsets.
         """
-        with open(graph_file, "w") as fp:  # pylint: disable=W1514
-            dat: dict = nx.node_link_data(
-                self.graph,
-                edges = "edges", # for forward compatibility
+        enc: msgspec.json.Encoder = msgspec.json.Encoder()
+        buf: bytearray = bytearray()
+
+        with open(graph_file, "wb") as fp:
+            enc.encode_into(
+                {
+                    "directed": self.graph.is_directed(),
+                    "multigraph": self.graph.is_multigraph(),
+                    "graph": self.graph.graph,
+                },
+                buf,
             )
 
-            json.dump(
-                dat,
-                fp,
-                indent = 2,
-                ensure_ascii = False,
-            )
+            # reopen the header object to append the nodes and edges
+            del buf[-1:]
+            buf.extend(b',\n"nodes": [\n')
+
+            for i, (node_id, dat) in enumerate(self.graph.nodes(data = True)):
+                if i > 0:
+                    buf.extend(b",\n")
+
+                enc.encode_into({ **dat, "id": node_id }, buf, -1)
+
+                if len(buf) >= self.WRITE_BUFFER_SIZE:
+                    fp.write(buf)
+                    buf.clear()
+
+            # "edges" rather than "links", for forward compatibility
+            buf.extend(b'\n],\n"edges": [\n')
+
+            for i, (src_id, dst_id, dat) in enumerate(self.graph.edges(data = True)):
+                if i > 0:
+                    buf.extend(b",\n")
+
+                enc.encode_into({ **dat, "source": src_id, "target": dst_id }, buf, -1)
+
+                if len(buf) >= self.WRITE_BUFFER_SIZE:
+                    fp.write(buf)
+                    buf.clear()
+
+            buf.extend(b"\n]\n}\n")
+            fp.write(buf)
 
 
     def report (
         self,
+        *,
+        verbose: bool = False,
         ) -> None:
         """
-Report measures for the loaded network.
+Report measures for the loaded network, and optionally list every node
+and edge.
         """
-        ic(len(self.graph.nodes))
-        ic(len(self.graph.edges))
+        # counting the edges walks the adjacency, so only when logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("nodes: %d", len(self.graph.nodes))
+            logger.debug("edges: %d", len(self.graph.edges))
 
-        for src_id, dat in self.graph.nodes(data = True):
-            ic(src_id, dat)
+        if verbose:
+            for src_id, dat in self.graph.nodes(data = True):
+                print(src_id, dat)
 
-        for src_id, dst_id, dat in self.graph.edges(data = True):
-            ic(src_id, dst_id, dat)
+            for src_id, dst_id, dat in self.graph.edges(data = True):
+                print(src_id, dst_id, dat)
@@ -9,10 +9,10 @@ Simulating patterns of bad-actor tradecraft.
 
 from datetime import datetime, timedelta
 import itertools
+import logging
 import random
 import typing
 
-from icecream import ic  # type: ignore  # pylint: disable=E0401
 import networkx as nx
 import numpy as np
 
@@ -20,10 +20,13 @@ from .net import Network
 from .syn import SynData
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 ######################################################################
 ## class definitions: simulated patterns of tradecraft
 
-class Simulation:
+class Simulation:  # pylint: disable=R0902
     """
 Simulated patterns of tradecraft.
     """
@@ -31,7 +34,7 @@ Simulated patterns of tradecraft.
     MAX_PATH_LEN: int = 7
     MIN_CLIQUE_SIZE: int = 3
 
-    SANCTIONED_COUNTRIES: typing.Set[ str ] = set([
+    SANCTIONED_COUNTRIES: typing.FrozenSet[ str ] = frozenset([
         "RU",
     ])
 
@@ -59,10 +62,17 @@ Constructor.
 
         self.start: datetime = datetime.fromisoformat(self.config["start_date"])
         self.finish: datetime = self.start
+        # latest fraud timing offset so far, in whole days after `start`
+        self.finish_days: int = 0
 
         self.b2b_actors: typing.Set[ str ] = set()
         self.bad_actors: typing.Set[ str ] = set()
 
+        # viable bad-actor subgraphs, enumerated once per graph, and keyed
+        # on its node and edge counts too, since `Network.load()` changes
+        # the graph in place: `(graph, (nodes, edges), cliques)`
+        self.bad_cliques: tuple = ( None, ( 0, 0, ), [], )
+
         self.total_fraud: float = 0.0
 
 
@@ -75,7 +85,7 @@ Constructor.
         """
 Sample random numbers from a Gaussian distribution.
         """
-        return float(self.rng.normal(loc = mean, scale = stdev, size = 1)[0])
+        return float(self.rng.normal(loc = mean, scale = stdev))
 
 
     def rng_exponential (
@@ -86,33 +96,7 @@ Sample random numbers from a Gaussian distribution.
         """
 Sample random numbers from an Exponential distribution.
         """
-        return float(self.rng.exponential(scale = scale, size = 1)[0])
-
-
-    def rng_poisson (
-        self,
-        *,
-        lambda_: float = 1.0,
-        ) -> float:
-        """
-Sample random numbers from a Poisson distribution.
-        """
-        return float(self.rng.poisson(lam = lambda_, size = 1)[0])
-
-
-    @classmethod
-    def rng_uniform_datetime (
-        cls,
-        start: datetime,
-        finish: datetime,
-        ) -> datetime:
-        """
-Sample random dates between two `datetime` objects.
-        """
-        delta: timedelta = finish - start
-        rand_sec: int = random.randrange((delta.days * 24 * 60 * 60) + delta.seconds)
-
-        return start + timedelta(seconds = rand_sec)
+        return float(self.rng.exponential(scale = scale))
 
 
     def select_bad_actor (
@@ -121,115 +105,156 @@ Sample random dates between two `datetime` objects.
         ) -> list:
         """
 Select the bad-actor networks from among the viable subgraphs.
+The viable subgraphs get enumerated on the first call, then reused on
+later calls until the graph or its size changes.
 
 returns:
     bad-actor network patterns
         """
+        graph_size: typing.Tuple[ int, int ] = ( graph.number_of_nodes(), graph.number_of_edges(), )
+
+        cache_graph, cache_size, cache_cliques = self.bad_cliques
+
+        if graph is cache_graph and graph_size == cache_size:
+            return random.choice(cache_cliques)
+
         bad_cliques: list = []
 
         for clique in nx.weakly_connected_components(graph):
-            owners: list = sorted([
-                ( graph.nodes[node_id]["rank"], node_id, )
-                for node_id in clique
-                if graph.nodes[node_id]["kind"] == "entity"
-                if graph.nodes[node_id]["type"] == "ftm:Person"
-            ], reverse = True)
-
-            shells: list = [
-                node_id
-                for node_id in clique
-                if graph.nodes[node_id]["kind"] == "entity"
-                if graph.nodes[node_id]["type"] == "ftm:Company"
-                if graph.nodes[node_id]["country"] not in self.SANCTIONED_COUNTRIES
-            ]
+            # too small to hold an owner plus the minimum shell corps
+            if len(clique) < self.MIN_CLIQUE_SIZE + 1:
+                continue
 
-            if len(owners) > 0 and len(shells) >= self.MIN_CLIQUE_SIZE:
-                bad_cliques.append([[ owners[0][1] ] + shells, clique ])
+            # classify the entities in one pass over the component
+            owners: list = []
+            shells: list = []
 
-        return random.choice(bad_cliques)
+            for node_id in clique:
+                dat: dict = graph._node[node_id]  # pylint: disable=W0212
 
+                if dat["kind"] != "entity":
+                    continue
 
-    def gen_xact_amount (
-        self,
-        ) -> float:
-        """
-Generate the amount for a transaction, based on a random variable.
+                node_type: str = dat["type"]
 
-returns:
-    `amount`: transaction amount, non-negative, rounded to two decimal points.
-        """
-        gen_amount: float = self.rng_gaussian(
-            mean = self.XACT_CHUNK_MEDIAN / 2.0,
-            stdev = self.XACT_CHUNK_MEDIAN / 10.0,
-        )
+                if node_type == "ftm:Person":
+                    owners.append(( dat["rank"], node_id, ))
+                elif node_type == "ftm:Company" and dat["country"] not in self.SANCTIONED_COUNTRIES:
+                    shells.append(node_id)
+
+            if len(owners) > 0 and len(shells) >= self.MIN_CLIQUE_SIZE:
+                bad_cliques.append([[ max(owners)[1] ] + shells, clique ])
 
-        amount: float = round(self.XACT_CHUNK_MEDIAN - gen_amount, 2)
-        assert amount > 0.0, f"negative amount: {gen_amount}"
+        self.bad_cliques = ( graph, graph_size, bad_cliques, )
 
-        return amount
+        return random.choice(bad_cliques)
 
 
-    def gen_xact_timing (
+    def gen_xact_amounts (
         self,
-        ) -> datetime:
+        size: int,
+        ) -> np.ndarray:
         """
-Generate the timing for a transaction, based on a random variable.
+Generate the amounts for a batch of transactions, in one vectorized
+draw from a Gaussian distribution.
 
 returns:
-    `timing`: transaction datetime offset
+    `amounts`: array of transaction amounts, non-negative, rounded to two decimal points.
         """
-        gen_offset: float = self.rng_poisson(lambda_ = self.XACT_TIMING_MEDIAN)
-        timing: datetime = self.start + timedelta(hours = gen_offset * 24.0)
+        gen_amounts: np.ndarray = self.rng.normal(
+            loc = self.XACT_CHUNK_MEDIAN / 2.0,
+            scale = self.XACT_CHUNK_MEDIAN / 10.0,
+            size = size,
+        )
+
+        amounts: np.ndarray = np.round(self.XACT_CHUNK_MEDIAN - gen_amounts, 2)
+        assert (amounts > 0.0).all(), f"negative amount: {gen_amounts.max()}"
 
-        return timing
+        return amounts
 
 
-    def run_one_fraud (  # pylint: disable=R0913,R0917
+    def run_one_fraud (  # pylint: disable=R0913,R0914,R0917
         self,
         net: Network,
         syn: SynData,
-        paths: typing.List[ str ],
+        paths: typing.List[ typing.List[ str ]],
         *,
+        budget: typing.Optional[ float ] = None,
         debug: bool = True,
         ) -> float:
         """
 Simulate one bad-actor running fraud.
+When a `budget` is given, stop before starting another path once the
+transferred amount reaches it.
 
 returns:
     `subtotal`: amount of money transferred
         """
         subtotal: float = 0.0
+        start_sec: np.datetime64 = np.datetime64(self.start, "s")
+        node_attr: dict = net.graph._node  # pylint: disable=W0212
+        fraud_key: str = syn.FRAUD_COL_NAME
+
+        for path in paths:
+            if budget is not None and subtotal >= budget:
+                break
+
+            # draw the amounts and timing offsets, in days, for every hop
+            # along the path at once, then format the dates in one call
+            offsets: np.ndarray = self.rng.poisson(
+                lam = self.XACT_TIMING_MEDIAN,
+                size = len(path) - 1,
+            )
+
+            if len(offsets) < 1:
+                continue
+
+            dates: typing.List[ str ] = np.datetime_as_string(
+                start_sec + (offsets * 86400).astype("timedelta64[s]"),
+                unit = "D",
+            ).tolist()
+
+            # compare integer day offsets, and only build a new `finish`
+            # datetime when the timing extends past the previous one
+            max_days: int = int(offsets.max())
 
-        for path in random.sample(paths, 4):
-            for pair in itertools.pairwise(path):
+            if max_days > self.finish_days:
+                self.finish_days = max_days
+                self.finish = self.start + timedelta(days = max_days)
+
+            amounts: np.ndarray = self.gen_xact_amounts(len(offsets))
+            subtotal += float(amounts.sum())
+
+            # collect the records for this path, then add them as one batch
+            ents: typing.List[ dict ] = []
+            xacts: typing.List[ dict ] = []
+
+            for pair, amount, date in zip(itertools.pairwise(path), amounts.tolist(), dates):
                 pay_id: str = pair[0]
                 pay_info: dict = net.get_pii_features(pay_id)
-                syn.add_entity(pay_info)
+                ents.append(pay_info)
 
                 ben_id: str = pair[1]
                 ben_info: dict = net.get_pii_features(ben_id)
-                syn.add_entity(ben_info)
-
-                amount: float = self.gen_xact_amount()
-                subtotal += amount
-
-                timing: datetime = self.gen_xact_timing()
-                self.finish = max(self.finish, timing)
+                ents.append(ben_info)
 
                 if debug:
-                    ic(pair, amount, timing)
+                    logger.debug("fraud %s -> %s: %.2f on %s", pay_id, ben_id, amount, date)
 
                 # accumulate results from these simulation steps
-                syn.add_transact({
+                xacts.append({
                     "pay": pay_info["name"],
-                    "pay_country": net.graph.nodes[pay_id]["country"],
+                    "pay_country": node_attr[pay_id]["country"],
                     "ben": ben_info["name"],
-                    "ben_country": net.graph.nodes[ben_id]["country"],
+                    "ben_country": node_attr[ben_id]["country"],
                     "amount": amount,
-                    "date": timing.date().isoformat(),
-                    syn.FRAUD_COL_NAME: True,
+                    "date": date,
+                    fraud_key: True,
                 })
 
+            syn.add_entities(ents)
+            syn.add_transacts(xacts)
+
         return subtotal
 
 
@@ -246,15 +271,14 @@ Simulate patterns of tradecraft across sampled bad-actor networks.
         # populate the bad-actor network
         bad_actor: list = self.select_bad_actor(net.graph)
         bad_clique: typing.List[ str ] = bad_actor[0]
-        self.bad_actors.update(set(bad_actor[1]))
+        self.bad_actors.update(bad_actor[1])
 
-        if debug:
+        if debug and logger.isEnabledFor(logging.DEBUG):
             for node_id in bad_clique:
-                dat: dict = net.graph.nodes[node_id]
-                ic(node_id, dat)
+                logger.debug("bad actor %s: %s", node_id, net.graph.nodes[node_id])
 
         ubo_owner: str = bad_clique[0]
-        shell_corps: typing.Set[ str ] = set(bad_clique[1:])
+        shell_corps: typing.Tuple[ str, ... ] = tuple(bad_clique[1:])
 
         path_range: typing.List[ int ] = list(
             range(
@@ -273,31 +297,36 @@ Simulate patterns of tradecraft across sampled bad-actor networks.
         )
 
         if debug:
-            ic(ubo_owner, target_funds, path_range, shell_corps)
+            logger.debug(
+                "fraud by %s: target %.2f, path lengths %s, shell corps %s",
+                ubo_owner, target_funds, path_range, shell_corps,
+            )
 
         # iterate until reaching the target amount
         subtotal: float = 0.0
 
         while subtotal < target_funds:
-            # generate paths among the shell corps
-            paths: typing.List[ str ] = list(
-                itertools.permutations(  # type: ignore
-                    shell_corps,
-                    r = random.choice(path_range),
-                )
-            )
+            # sample random paths among the shell corps directly, rather
+            # than materializing all of their permutations
+            path_len: int = random.choice(path_range)
+
+            paths: typing.List[ typing.List[ str ]] = [
+                random.sample(shell_corps, path_len)
+                for _ in range(4)
+            ]
 
             subtotal += self.run_one_fraud(
                 net,
                 syn,
                 paths,
+                budget = target_funds - subtotal,
                 debug = debug,
             )
 
         self.total_fraud += subtotal
 
 
-    def simulate_legit (
+    def simulate_legit (  # pylint: disable=R0914
         self,
         net: Network,
         syn: SynData,
@@ -320,39 +349,75 @@ Simulate legit B2B transfers.
         # generate a target for transferred funds based the inverse of the fraud rate
         target_funds: float = self.total_fraud / self.APPROX_FRAUD_RATE
 
-        # iterate until reaching the target amount
+        node_attr: dict = net.graph._node  # pylint: disable=W0212
+        fraud_key: str = syn.FRAUD_COL_NAME
+        n_shells: int = len(shells)
+        span_sec: int = int((self.finish - self.start).total_seconds())
+        start_sec: np.datetime64 = np.datetime64(self.start, "s")
+
+        # sample the transactions in vectorized batches, sized from the
+        # expected amount per transaction, until reaching the target amount
         subtotal: float = 0.0
 
         while subtotal < target_funds:
-            pair: typing.List[ str ] = random.sample(shells, 2)
-            self.b2b_actors.update(set(pair))
+            batch_size: int = int(2.2 * (target_funds - subtotal) / self.XACT_CHUNK_MEDIAN) + 1
+
+            # offset from the payer by 1..n-1, so the pair never repeats a company
+            pay_idx: np.ndarray = self.rng.integers(0, n_shells, size = batch_size)
+            ben_idx: np.ndarray = (pay_idx + self.rng.integers(1, n_shells, size = batch_size)) % n_shells
+
+            amounts: np.ndarray = self.gen_xact_amounts(batch_size)
+
+            # keep transactions up through the one which reaches the target
+            running: np.ndarray = subtotal + np.cumsum(amounts)
+            n_keep: int = min(batch_size, int(np.searchsorted(running, target_funds)) + 1)
+            subtotal = float(running[n_keep - 1])
+
+            dates: np.ndarray = np.datetime_as_string(
+                start_sec + self.rng.integers(0, span_sec, size = n_keep).astype("timedelta64[s]"),
+                unit = "D",
+            )
+
+            pay_list: typing.List[ int ] = pay_idx[:n_keep].tolist()
+            ben_list: typing.List[ int ] = ben_idx[:n_keep].tolist()
+
+            self.b2b_actors.update(map(shells.__getitem__, pay_list))
+            self.b2b_actors.update(map(shells.__getitem__, ben_list))
 
-            pay_id: str = pair[0]
-            pay_info: dict = net.get_pii_features(pay_id)
-            syn.add_entity(pay_info)
+            # collect the records for this batch, then add them all at once
+            ents: typing.List[ dict ] = []
+            xacts: typing.List[ dict ] = []
 
-            ben_id: str = pair[1]
-            ben_info: dict = net.get_pii_features(ben_id)
-            syn.add_entity(ben_info)
+            for pay_i, ben_i, amount, date in zip(
+                pay_list,
+                ben_list,
+                amounts[:n_keep].tolist(),
+                dates.tolist(),
+            ):
+                pay_id: str = shells[pay_i]
+                pay_info: dict = net.get_pii_features(pay_id)
+                ents.append(pay_info)
 
-            amount: float = self.gen_xact_amount()
-            subtotal += amount
+                ben_id: str = shells[ben_i]
+                ben_info: dict = net.get_pii_features(ben_id)
+                ents.append(ben_info)
 
-            timing: datetime = self.rng_uniform_datetime(self.start, self.finish)
+                if debug:
+                    logger.debug("legit %s -> %s: %.2f on %s", pay_id, ben_id, amount, date)
 
-            if debug:
-                ic(pair, amount, timing)
+                # accumulate results from these simulation steps
+                xacts.append({
+                    "pay": pay_info["name"],
+                    "pay_country": node_attr[pay_id]["country"],
+                    "ben": ben_info["name"],
+                    "ben_country": node_attr[ben_id]["country"],
+                    "amount": amount,
+                    "date": date,
+                    fraud_key: False,
+                })
 
-            # accumulate results from these simulation steps
-            syn.add_transact({
-                "pay": pay_info["name"],
-                "pay_country": net.graph.nodes[pay_id]["country"],
-                "ben": ben_info["name"],
-                "ben_country": net.graph.nodes[ben_id]["country"],
-                "amount": amount,
-                "date": timing.date().isoformat(),
-                syn.FRAUD_COL_NAME: False,
-            })
+            syn.add_entities(ents)
+            syn.add_transacts(xacts)
 
         if debug:
-            ic(subtotal)
+            logger.debug("legit subtotal: %.2f", subtotal)
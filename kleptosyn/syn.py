@@ -7,34 +7,261 @@ see copyright/license <https://github.com/DerwenAI/kleptosyn/blob/main/LICENSE>
 Synthetic data generation.
 """
 
+import csv
+import itertools
+import logging
+import operator
 import pathlib
 import typing
 
-from icecream import ic  # type: ignore  # pylint: disable=E0401
-import pandas as pd
+import msgspec
+
+
+logger: logging.Logger = logging.getLogger(__name__)
 
 
 ######################################################################
 ## class definitions: synthetic data results
 
-class SynData:
+class SynData:  # pylint: disable=R0902
     """
 Synthetic data results: people, companies, transactions.
     """
     FRAUD_COL_NAME: str = "fraud"
+    WRITE_CHUNK_SIZE: int = 65536
+    WRITE_BUFFER_SIZE: int = 1 << 20
+    STREAM_FORMATS: typing.FrozenSet[ str ] = frozenset([ "csv", "jsonl" ])
+    JSON_ENCODER: msgspec.json.Encoder = msgspec.json.Encoder()
+
+    __slots__ = (
+        "xact",
+        "ents",
+        "xact_cols",
+        "xact_getter",
+        "xact_path",
+        "xact_format",
+        "xact_fp",
+        "xact_writer",
+    )
 
 
     def __init__ (
         self,
-        config: dict,
+        config: dict,  # pylint: disable=W0613
         ) -> None:
         """
-Constructor.
+Constructor. None of the `config` settings apply to the synthetic data
+results, so no reference to it gets kept.
         """
-        self.config: dict = config
+        self.xact: typing.List[ tuple ] = []
+        # entities get de-duplicated on insertion, keyed by their values,
+        # keeping the first occurrence of each
+        self.ents: typing.Dict[ tuple, dict ] = {}
+
+        # column names and field getter for the transactions, taken
+        # from the keys of the first transaction added
+        self.xact_cols: typing.Optional[ typing.List[ str ] ] = None
+        self.xact_getter: typing.Optional[ typing.Callable ] = None
+
+        # optional streaming sink for transactions: `open_streams()`
+        # creates the file, then it gets opened for appending on the next
+        # write after each `dump()`
+        self.xact_path: typing.Optional[ pathlib.Path ] = None
+        self.xact_format: str = "csv"
+        self.xact_fp: typing.Optional[ typing.IO ] = None
+        self.xact_writer: typing.Optional[ typing.Any ] = None
 
-        self.xact: typing.List[ dict ] = []
-        self.ents: typing.List[ dict ] = []
+
+    def open_streams (
+        self,
+        xact_file: pathlib.Path,
+        *,
+        file_format: str = "csv",
+        ) -> None:
+        """
+Stream the transactions directly to `xact_file` as they get added,
+instead of buffering them in memory until `dump()` gets called.
+With `file_format = "jsonl"` the rows get written as JSON lines, to
+the same path with a `.jsonl` suffix.
+
+This truncates the file once; transactions added after a `dump()`
+get appended to it.
+        """
+        if file_format not in self.STREAM_FORMATS:
+            raise ValueError(f"unknown stream format: {file_format}")
+
+        if self.xact_path is not None:
+            raise ValueError(f"transactions already stream to: {self.xact_path}")
+
+        self.xact_format = file_format
+        self.xact_path = self._stream_file(xact_file)
+        self.xact_path.write_bytes(b"")
+
+
+    def _stream_file (
+        self,
+        xact_file: pathlib.Path,
+        ) -> pathlib.Path:
+        """
+Map the transaction file path onto the streaming format's path.
+
+returns:
+    the path which the streamed transactions get written to
+        """
+        if self.xact_format == "jsonl":
+            return xact_file.with_suffix(".jsonl")
+
+        return xact_file
+
+
+    def _xact_rows (
+        self,
+        transacts: typing.Iterable[ dict ],
+        ) -> typing.Iterator[ tuple ]:
+        """
+Convert transactions into tuples of field values, without the fraud
+column, setting the column names from the first transaction if needed.
+
+returns:
+    iterator over the row tuples
+        """
+        rows: typing.Iterator[ dict ] = iter(transacts)
+
+        if self.xact_getter is None:
+            first: typing.Optional[ dict ] = next(rows, None)
+
+            if first is None:
+                return iter(())
+
+            self.xact_cols = [
+                col
+                for col in first
+                if col != self.FRAUD_COL_NAME
+            ]
+
+            if len(self.xact_cols) > 1:
+                self.xact_getter = operator.itemgetter(*self.xact_cols)
+            else:
+                self.xact_getter = lambda transact, col = self.xact_cols[0]: ( transact[col], )
+            rows = itertools.chain(( first, ), rows)
+
+        return map(self.xact_getter, rows)
+
+
+    def _write_transacts (
+        self,
+        rows: typing.Iterator[ tuple ],
+        ) -> None:
+        """
+Write a batch of transaction rows to the streaming sink, opening it and
+writing the header first if needed.
+        """
+        if self.xact_cols is None:
+            return
+
+        if self.xact_format == "jsonl":
+            if self.xact_fp is None:
+                self.xact_fp = open(  # pylint: disable=R1732
+                    self.xact_path,  # type: ignore
+                    "ab",
+                    buffering = self.WRITE_BUFFER_SIZE,
+                )
+
+            bin_fp: typing.BinaryIO = typing.cast(typing.BinaryIO, self.xact_fp)
+            self._write_jsonl(bin_fp, self.xact_cols, rows)
+
+            return
+
+        if self.xact_fp is None:
+            self.xact_fp = open(  # pylint: disable=R1732
+                self.xact_path,  # type: ignore
+                "a",
+                buffering = self.WRITE_BUFFER_SIZE,
+                encoding = "utf-8",
+                newline = "",
+            )
+
+            self.xact_writer = csv.writer(
+                typing.cast(typing.TextIO, self.xact_fp),
+                delimiter = "\t",
+                lineterminator = "\n",
+            )
+
+            # only an empty file needs the header
+            if self.xact_fp.tell() == 0:
+                self.xact_writer.writerow(self.xact_cols)
+
+        text_fp: typing.TextIO = typing.cast(typing.TextIO, self.xact_fp)
+        self._write_rows(text_fp, self.xact_writer, rows, len(self.xact_cols))
+
+
+    @classmethod
+    def _write_rows (
+        cls,
+        fp: typing.TextIO,
+        writer: typing.Any,
+        rows: typing.Iterable[ tuple ],
+        n_cols: int,
+        ) -> None:
+        """
+Write rows of field values in chunks, formatting each chunk with one
+`%` pass over its flattened values. Missing values get written as empty
+fields, and any chunk which would need quoting falls back to `writer`,
+so the output stays the same as `csv.writer` would produce.
+        """
+        if n_cols < 2:
+            # `csv.writer` quotes a lone empty field, so leave it to that
+            writer.writerows(rows)
+            return
+
+        row_fmt: str = "\t".join([ "%s" ] * n_cols) + "\n"
+        row_iter: typing.Iterator[ tuple ] = iter(rows)
+
+        while True:
+            chunk: typing.List[ tuple ] = list(itertools.islice(row_iter, cls.WRITE_CHUNK_SIZE))
+
+            if len(chunk) < 1:
+                break
+
+            n_rows: int = len(chunk)
+            values: tuple = tuple(itertools.chain.from_iterable(chunk))
+
+            # `csv.writer` writes `None` as an empty, unquoted field
+            if None in values:
+                values = tuple("" if val is None else val for val in values)
+
+            text: str = (row_fmt * n_rows) % values
+
+            if '"' in text or "\r" in text or \
+               text.count("\n") != n_rows or text.count("\t") != n_rows * (n_cols - 1):
+                writer.writerows(chunk)
+            else:
+                fp.write(text)
+
+
+    @classmethod
+    def _write_jsonl (
+        cls,
+        fp: typing.BinaryIO,
+        cols: typing.List[ str ],
+        rows: typing.Iterable[ tuple ],
+        ) -> None:
+        """
+Write rows of field values as JSON lines, encoding each chunk of rows
+with one `msgspec` call into a single write.
+        """
+        row_iter: typing.Iterator[ tuple ] = iter(rows)
+
+        while True:
+            chunk: typing.List[ tuple ] = list(itertools.islice(row_iter, cls.WRITE_CHUNK_SIZE))
+
+            if len(chunk) < 1:
+                break
+
+            fp.write(cls.JSON_ENCODER.encode_lines([
+                dict(zip(cols, row))
+                for row in chunk
+            ]))
 
 
     def add_transact (
@@ -44,7 +271,22 @@ Constructor.
         """
 Add a transaction to the results.
         """
-        self.xact.append(transact)
+        self.add_transacts(( transact, ))
+
+
+    def add_transacts (
+        self,
+        transacts: typing.Iterable[ dict ],
+        ) -> None:
+        """
+Add a batch of transactions to the results.
+        """
+        rows: typing.Iterator[ tuple ] = self._xact_rows(transacts)
+
+        if self.xact_path is not None:
+            self._write_transacts(rows)
+        else:
+            self.xact.extend(rows)
 
 
     def add_entity (
@@ -54,50 +296,199 @@ Add a transaction to the results.
         """
 Add an entity to the results.
         """
-        self.ents.append(entity)
+        self.ents.setdefault(tuple(entity.values()), entity)
 
 
-    def dump (
+    def add_entities (
+        self,
+        entities: typing.Iterable[ dict ],
+        ) -> None:
+        """
+Add a batch of entities to the results.
+        """
+        ents: typing.Dict[ tuple, dict ] = self.ents
+
+        for entity in entities:
+            ents.setdefault(tuple(entity.values()), entity)
+
+
+    def _dump_transacts (
         self,
         xact_file: pathlib.Path,
-        ents_file: pathlib.Path,
         *,
+        file_format: str = "csv",
         debug: bool = True,
         ) -> None:
         """
-Serialize the generated people, companies, and transactions.
+Serialize the buffered transactions.
         """
-        # serialize the transactions
-        df_xact: pd.DataFrame = pd.DataFrame.from_dict(
-            self.xact,
-            orient = "columns"
-        ).drop(
-            self.FRAUD_COL_NAME,
-            axis = 1,
-        )
+        if self.xact_cols is None:
+            return
 
-        if debug:
-            ic(df_xact.head())
+        if debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("transactions %s: %s", self.xact_cols, self.xact[:5])
 
-        df_xact.to_csv(
-            xact_file,
-            sep = "\t",
-            encoding = "utf-8",
-            index = False,
-        )
+        if file_format == "jsonl":
+            with open(xact_file.with_suffix(".jsonl"), "wb", buffering = self.WRITE_BUFFER_SIZE) as fp:
+                self._write_jsonl(fp, self.xact_cols, self.xact)
 
-        # serialize the people and companies
-        df_ents: pd.DataFrame = pd.DataFrame.from_dict(
-            self.ents,
-            orient = "columns"
-        ).drop_duplicates().sort_values(by = [ "name" ])
+            return
+
+        with open(xact_file, "w", buffering = self.WRITE_BUFFER_SIZE, encoding = "utf-8", newline = "") as fp:
+            writer = csv.writer(fp, delimiter = "\t", lineterminator = "\n")
+            writer.writerow(self.xact_cols)
+
+            self._write_rows(
+                fp,
+                writer,
+                self.xact,
+                len(self.xact_cols),
+            )
+
+
+    def _sorted_entities (
+        self,
+        ) -> typing.Tuple[ typing.List[ str ], typing.List[ tuple ]]:
+        """
+Sort the de-duplicated entities by name, with entities which have no
+name placed last.
 
-        if debug:
-            ic(df_ents.head())
+returns:
+    the column names, and the sorted entity rows
+        """
+        ents_cols: typing.List[ str ] = list(next(iter(self.ents.values())))
+        name_idx: int = ents_cols.index("name")
 
-        df_ents.to_csv(
-            ents_file,
-            sep = "\t",
-            encoding = "utf-8",
-            index = False,
+        rows: typing.List[ tuple ] = sorted(
+            self.ents,
+            key = lambda row: ( row[name_idx] is None, row[name_idx] or "", ),
         )
+
+        return ents_cols, rows
+
+
+    def _dump_entities (
+        self,
+        ents_file: pathlib.Path,
+        *,
+        file_format: str = "csv",
+        debug: bool = True,
+        ) -> None:
+        """
+Serialize the de-duplicated entities, sorted by name.
+        """
+        if len(self.ents) < 1:
+            return
+
+        ents_cols, rows = self._sorted_entities()
+
+        if debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("entities %s: %s", ents_cols, rows[:5])
+
+        if file_format == "jsonl":
+            with open(ents_file.with_suffix(".jsonl"), "wb", buffering = self.WRITE_BUFFER_SIZE) as fp:
+                self._write_jsonl(fp, ents_cols, rows)
+
+            return
+
+        with open(ents_file, "w", buffering = self.WRITE_BUFFER_SIZE, encoding = "utf-8", newline = "") as fp:
+            writer = csv.writer(fp, delimiter = "\t", lineterminator = "\n")
+            writer.writerow(ents_cols)
+
+            self._write_rows(
+                fp,
+                writer,
+                rows,
+                len(ents_cols),
+            )
+
+
+    def _dump_parquet (
+        self,
+        xact_file: pathlib.Path,
+        ents_file: pathlib.Path,
+        *,
+        debug: bool = True,
+        ) -> None:
+        """
+Serialize the buffered transactions and the entities as Parquet files,
+using the same paths with a `.parquet` suffix.
+This requires `pandas` and `pyarrow`, which get imported only here.
+        """
+        import pandas as pd  # pylint: disable=C0415
+
+        if self.xact_path is not None:
+            raise ValueError("Parquet output needs buffered transactions, not `open_streams()`")
+
+        if self.xact_cols is not None:
+            df_xact: pd.DataFrame = pd.DataFrame.from_records(
+                self.xact,
+                columns = self.xact_cols,
+            )
+
+            if debug and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("transactions:\n%s", df_xact.head())
+
+            df_xact.to_parquet(
+                xact_file.with_suffix(".parquet"),
+                engine = "pyarrow",
+                compression = "zstd",
+                index = False,
+            )
+
+        if len(self.ents) > 0:
+            ents_cols, rows = self._sorted_entities()
+
+            df_ents: pd.DataFrame = pd.DataFrame.from_records(
+                rows,
+                columns = ents_cols,
+            )
+
+            if debug and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("entities:\n%s", df_ents.head())
+
+            df_ents.to_parquet(
+                ents_file.with_suffix(".parquet"),
+                engine = "pyarrow",
+                compression = "zstd",
+                index = False,
+            )
+
+
+    def dump (
+        self,
+        xact_file: pathlib.Path,
+        ents_file: pathlib.Path,
+        *,
+        file_format: str = "csv",
+        debug: bool = True,
+        ) -> None:
+        """
+Serialize the generated people, companies, and transactions, either as
+tab-separated `"csv"` files (the default), `"jsonl"` files, or
+`"parquet"` files. Streamed transactions were already written in the
+format given to `open_streams()`, so this only closes their file, and
+`xact_file` must name that same file.
+        """
+        if file_format == "parquet":
+            self._dump_parquet(xact_file, ents_file, debug = debug)
+            return
+
+        if file_format not in self.STREAM_FORMATS:
+            raise ValueError(f"unknown file format: {file_format}")
+
+        # serialize the transactions: either close the streaming sink,
+        # or write the buffered rows
+        if self.xact_path is not None:
+            if self._stream_file(xact_file) != self.xact_path:
+                raise ValueError(f"transactions were streamed to: {self.xact_path}")
+
+            if self.xact_fp is not None:
+                self.xact_fp.close()
+                self.xact_fp = None
+                self.xact_writer = None
+        else:
+            self._dump_transacts(xact_file, file_format = file_format, debug = debug)
+
+        # serialize the people and companies
+        self._dump_entities(ents_file, file_format = file_format, debug = debug)
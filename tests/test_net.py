@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+see copyright/license <https://github.com/DerwenAI/kleptosyn/blob/main/LICENSE>
+
+Unit tests for the `Network` class.
+"""
+
+import pathlib
+
+import networkx as nx
+import pytest
+
+from kleptosyn import Network
+
+
+def test_eigenvector_centrality () -> None:
+    """
+The vectorized power iteration should match `nx.eigenvector_centrality()`
+on a seeded random digraph.
+    """
+    net: Network = Network({})
+    net.graph = nx.gnp_random_graph(200, 0.05, seed = 42, directed = True)
+
+    expected: dict = nx.eigenvector_centrality(net.graph)
+    observed: dict = net.eigenvector_centrality()
+
+    assert list(observed) == list(expected)
+
+    for node_id, rank in expected.items():
+        assert observed[node_id] == pytest.approx(rank, rel = 1.0e-9, abs = 1.0e-12)
+
+
+class TinyChunkNetwork (Network):
+    """
+Read with a chunk size smaller than most lines, so records span chunks.
+    """
+    READ_CHUNK_SIZE: int = 7
+
+
+def test_read_jsonl_chunks (
+    tmp_path: pathlib.Path,
+    ) -> None:
+    """
+Records split across read chunks, blank lines, and a trailing line with
+no newline should all parse the same as reading line by line.
+    """
+    lines: list = [
+        '{"RECORD_ID": "a1", "NAME": "Ünïcode Ltd"}',
+        '{"RECORD_ID": "b22"}',
+        "",
+        '{"RECORD_ID": "c333", "NAMES": [{"NAME_TYPE": "PRIMARY"}]}',
+        '{"RECORD_ID": "d4"}',
+    ]
+
+    jsonl_file: pathlib.Path = tmp_path / "records.json"
+    jsonl_file.write_text("\n".join(lines), encoding = "utf-8")
+
+    expected: list = [
+        Network.JSON_DECODER.decode(line)
+        for line in lines
+        if line
+    ]
+
+    assert list(TinyChunkNetwork.read_jsonl(jsonl_file)) == expected
+    assert list(Network.read_jsonl(jsonl_file)) == expected
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+see copyright/license <https://github.com/DerwenAI/kleptosyn/blob/main/LICENSE>
+
+Unit tests for the `SynData` class.
+"""
+
+import csv
+import io
+import pathlib
+import typing
+
+import msgspec
+import pytest
+
+from kleptosyn import SynData
+
+
+class TinyChunkSynData (SynData):
+    """
+Write with a small chunk size, so plain chunks and chunks which need
+the `csv.writer` fallback get mixed within one file.
+    """
+    __slots__ = ()
+    WRITE_CHUNK_SIZE: int = 2
+
+
+ROWS: list = [
+    ( "Acme Ltd", "GB", 1250.5, "2013-06-01", ),
+    ( "Tab\tCorp", "US", 10.0, "2013-06-02", ),
+    ( "Plain Inc", None, 2.25, "2013-06-03", ),
+    ( 'The "Quoted" Co', "FR", 3.0, "2013-06-04", ),
+    ( "Carriage\rReturn", "DE", 4.0, "2013-06-05", ),
+    ( "Nonesuch None LLC", "NL", 5.0, "2013-06-06", ),
+    ( "Line\nBreak SA", None, 6.0, "2013-06-07", ),
+    ( None, "", 7.0, "2013-06-08", ),
+    ( "Last Corp", "IT", 8.0, "2013-06-09", ),
+]
+
+
+def expected_csv (
+    rows: list,
+    ) -> str:
+    """
+Format the rows with `csv.writer`, as the reference output.
+
+returns:
+    the tab-separated text
+    """
+    fp: io.StringIO = io.StringIO()
+    writer = csv.writer(fp, delimiter = "\t", lineterminator = "\n")
+    writer.writerows(rows)
+
+    return fp.getvalue()
+
+
+@pytest.mark.parametrize("syn_class", [ SynData, TinyChunkSynData ])
+def test_write_rows_matches_csv (
+    syn_class: typing.Type[ SynData ],
+    ) -> None:
+    """
+The chunked `%` formatter should produce the same bytes as `csv.writer`
+for tabs, quotes, carriage returns, newlines, `None` values, and names
+which contain the text "None".
+    """
+    fp: io.StringIO = io.StringIO()
+    writer = csv.writer(fp, delimiter = "\t", lineterminator = "\n")
+
+    syn_class._write_rows(fp, writer, ROWS, len(ROWS[0]))  # pylint: disable=W0212
+
+    assert fp.getvalue() == expected_csv(ROWS)
+
+
+def test_write_rows_plain_chunk () -> None:
+    """
+Rows which only have `None` values and "None" substrings should not
+need the `csv.writer` fallback at all.
+    """
+    rows: list = [ ROWS[0], ROWS[2], ROWS[5], ROWS[8] ]
+
+    class NoFallback:  # pylint: disable=R0903
+        """
+Writer which fails the test if the fallback gets used.
+        """
+        def writerows (self, _rows) -> None:  # pylint: disable=C0116
+            pytest.fail("unexpected csv.writer fallback")
+
+    fp: io.StringIO = io.StringIO()
+    SynData._write_rows(fp, NoFallback(), rows, len(rows[0]))  # pylint: disable=W0212
+
+    assert fp.getvalue() == expected_csv(rows)
+
+
+XACTS: list = [
+    {
+        "pay": pay,
+        "pay_country": country,
+        "ben": "Beneficiary Ltd",
+        "ben_country": "GB",
+        "amount": amount,
+        "date": date,
+        SynData.FRAUD_COL_NAME: False,
+    }
+    for pay, country, amount, date in ROWS
+]
+
+ENTS: list = [
+    { "name": "Acme Ltd", "addr": None, "type": "organization" },
+    { "name": "Acme Ltd", "addr": None, "type": "organization" },
+]
+
+
+def dump_buffered (
+    tmp_path: pathlib.Path,
+    xacts: list,
+    ) -> bytes:
+    """
+Dump the transactions through the buffered path, as the reference output.
+
+returns:
+    the bytes of the transaction file
+    """
+    syn: SynData = SynData({})
+    syn.add_transacts(xacts)
+    syn.add_entities(ENTS)
+    syn.dump(tmp_path / "buffered.csv", tmp_path / "buffered_ents.csv", debug = False)
+
+    return (tmp_path / "buffered.csv").read_bytes()
+
+
+def test_stream_csv (
+    tmp_path: pathlib.Path,
+    ) -> None:
+    """
+Streamed CSV transactions should match the buffered output, including
+transactions added after a `dump()`, which get appended rather than
+overwriting the earlier rows or repeating the header.
+    """
+    xact_file: pathlib.Path = tmp_path / "transact.csv"
+    ents_file: pathlib.Path = tmp_path / "entities.csv"
+
+    syn: SynData = SynData({})
+    syn.open_streams(xact_file)
+    syn.add_transacts(XACTS[:4])
+    syn.add_transact(XACTS[4])
+    syn.add_entities(ENTS)
+    syn.dump(xact_file, ents_file, debug = False)
+
+    assert xact_file.read_bytes() == dump_buffered(tmp_path, XACTS[:5])
+
+    syn.add_transacts(XACTS[5:])
+    syn.dump(xact_file, ents_file, debug = False)
+
+    assert xact_file.read_bytes() == dump_buffered(tmp_path, XACTS)
+
+
+def test_stream_jsonl (
+    tmp_path: pathlib.Path,
+    ) -> None:
+    """
+Streamed JSONL transactions should hold one object per transaction,
+without the fraud column, and also append after a `dump()`.
+    """
+    xact_file: pathlib.Path = tmp_path / "transact.csv"
+    ents_file: pathlib.Path = tmp_path / "entities.csv"
+
+    syn: SynData = SynData({})
+    syn.open_streams(xact_file, file_format = "jsonl")
+    syn.add_transacts(XACTS[:3])
+    syn.add_entities(ENTS)
+    syn.dump(xact_file, ents_file, file_format = "jsonl", debug = False)
+    syn.add_transacts(XACTS[3:])
+    syn.dump(xact_file, ents_file, file_format = "jsonl", debug = False)
+
+    expected: list = [
+        {
+            key: val
+            for key, val in xact.items()
+            if key != SynData.FRAUD_COL_NAME
+        }
+        for xact in XACTS
+    ]
+
+    lines: list = (tmp_path / "transact.jsonl").read_bytes().splitlines()
+
+    assert [ msgspec.json.decode(line) for line in lines ] == expected
+    assert (tmp_path / "entities.jsonl").read_bytes().count(b"\n") == 1
+
+
+def test_stream_dump_other_file (
+    tmp_path: pathlib.Path,
+    ) -> None:
+    """
+Calling `dump()` with a transaction file other than the streamed one
+should raise rather than get silently ignored.
+    """
+    syn: SynData = SynData({})
+    syn.open_streams(tmp_path / "transact.csv")
+    syn.add_transacts(XACTS)
+
+    with pytest.raises(ValueError):
+        syn.dump(tmp_path / "other.csv", tmp_path / "entities.csv", debug = False)